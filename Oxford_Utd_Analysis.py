@@ -1,104 +1,220 @@
 import sqlite3
+from dataclasses import dataclass
+
+import numpy as np
 import pandas as pd
 
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError: # Numba is optional; the scorer falls back to plain NumPy without it
+    NUMBA_AVAILABLE = False
+
+try:
+    import numexpr as ne
+    NUMEXPR_AVAILABLE = True
+except ImportError: # numexpr is optional; normalisation falls back to plain NumPy without it
+    NUMEXPR_AVAILABLE = False
+
+try:
+    import pyarrow  # Only probed for availability, so table reads can request Arrow-backed dtypes
+    PYARROW_AVAILABLE = True
+except ImportError: # pyarrow is optional; table reads fall back to the default NumPy dtypes
+    PYARROW_AVAILABLE = False
+
+NUMEXPR_MIN_SIZE = 10_000   # numexpr's threading/fusion only pays off past ~10k elements
+SMALL_GROUP_SIZE = 16   # Below this many players a group skips the matmul/JIT kernel for an unrolled expression
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def score_block(X, inv_max, weight_vec, out, idx):
+        """JIT-compiled kernel that scores one (position, role) group of players.
+
+        Fuses the normalise-weight-accumulate steps into a single pass over the
+        stats matrix instead of separate divide and matmul passes.
+
+        Args:
+        X (np.ndarray): Stats matrix for the group, one row per player.
+        inv_max (np.ndarray): Reciprocal of the maximum value for each stat.
+        weight_vec (np.ndarray): Weight for each stat.
+        out (np.ndarray): Full raw score array to write the results into.
+        idx (np.ndarray): Row index in `out` for each player in the group.
+        """
+        for i in prange(X.shape[0]):
+            score = 0.0
+            for j in range(X.shape[1]):
+                score += X[i, j] * inv_max[j] * weight_vec[j]
+            out[idx[i]] = score
+
 # Database Helper Functions
-def fetch_table_data(conn, table_name):
+def fetch_table_data(conn, table_name, chunksize=50_000):
     """Function to fetch data from a database table.
-    
+
+    Streams the table in chunks rather than materialising it in one shot, and asks
+    for Arrow-backed dtypes when pyarrow is installed so numeric columns arrive as
+    native numeric types instead of Python objects.
+
     Args:
     conn (sqlite3.Connection): Connection to the database.
     table_name (str): Name of the table to fetch data from.
+    chunksize (int, optional): Number of rows to read per chunk. Defaults to 50,000.
 
     Returns:
     pd.DataFrame: DataFrame containing the data from the specified table.
     """
-    return pd.read_sql_query(f"SELECT * FROM {table_name}", conn)
+    query = f"SELECT * FROM {table_name}"
+    if PYARROW_AVAILABLE:   # Request Arrow-backed dtypes only when pyarrow can actually be imported
+        chunks = pd.read_sql_query(query, conn, chunksize=chunksize, dtype_backend='pyarrow')
+    else:
+        chunks = pd.read_sql_query(query, conn, chunksize=chunksize)
+    return pd.concat(chunks, ignore_index=True)
+
+def save_calculations(df, conn):
+    """Function to save the calculated scores and ratings to the 'calculations' table.
+
+    Streams the result rows straight into one prepared INSERT inside a single
+    transaction, rather than copying them into an intermediate DataFrame and
+    round-tripping through to_sql.
 
-def save_table_to_db(df, table_name, conn):
-    """Function to save a DataFrame to a database table.
-    
     Args:
-    df (pd.DataFrame): DataFrame to save to the database.
-    table_name (str): Name of the table to save the data to.
+    df (pd.DataFrame): DataFrame containing the player data with the raw_score and
+    normalised_rating columns filled in.
     conn (sqlite3.Connection): Connection to the database.
     """
-    df.to_sql(table_name, conn, if_exists='replace', index=False)
+    cursor = conn.cursor()
+    cursor.execute("DROP TABLE IF EXISTS calculations") # Replace the table like to_sql's if_exists='replace'
+    cursor.execute("CREATE TABLE calculations (Name TEXT, Position TEXT, raw_score REAL, normalised_rating REAL)")
+    rows = df[['Name', 'Position', 'raw_score', 'normalised_rating']].itertuples(index=False, name=None)    # Plain tuples, no per-row Series
+    with conn:  # One transaction, one commit for the whole insert
+        conn.executemany("INSERT INTO calculations VALUES (?, ?, ?, ?)", rows)
+
+# Calculation Functions
+@dataclass(frozen=True, slots=True)
+class PositionKernel:
+    """Precomputed scoring inputs for one position.
+
+    Attributes:
+    stats (tuple): Stats that contribute to the position's rating, in weight order.
+    weight_vec (np.ndarray): float32 weight for each stat.
+    inv_max_by_role (dict): float32 reciprocal of each stat's maximum value, per role.
+    score_small (callable): Scoring function with the weights inlined as constants,
+    used for groups too small to be worth a matmul/JIT call.
+    """
+    stats: tuple
+    weight_vec: np.ndarray
+    inv_max_by_role: dict
+    score_small: callable
+
+def specialise_scorer(position, weight_vec):
+    """
+    Function to generate a position-specific scoring function with the weights inlined.
+
+    Zero-weight stats are dropped and every remaining weight is folded into the
+    generated source as a constant, so tiny groups (e.g. the lone goalkeeper) are
+    scored by one unrolled expression with no weight-vector traffic or matmul
+    setup cost.
 
-# Helper Functions
-def stat_value(row, stat, default=0):
-    """Function to get the value of a stat from a row, with a default value of 0 if the stat is NaN.
-    
     Args:
-    row (pd.Series): Row containing the data.
-    stat (str): Name of the stat to get the value of.
-    default (int, optional): Default value to return if the stat is NaN. Defaults to 0.
+    position (str): Position the function is specialised for, used in its name.
+    weight_vec (np.ndarray): Weight for each stat, aligned to the position's stats.
 
     Returns:
-    int: Value of the stat from the row.
+    callable: Function mapping a range-normalised stats matrix to raw scores.
+    """
+    terms = ' + '.join(f'{weight!r} * M[:, {i}]'
+                       for i, weight in enumerate(weight_vec.tolist()) if weight != 0)  # One constant-folded term per weighted stat
+    source = f"def _score_{position}(M): return {terms or '0.0 * M[:, 0]'}"
+    namespace = {}
+    exec(source, namespace) # Compile the specialised function
+    return namespace[f'_score_{position}']
+
+def build_kernels(position_stats, weights, stat_ranges_by_role):
     """
-    return row[stat] if pd.notna(row[stat]) else default
+    Function to pre-build a PositionKernel for each position.
+
+    Each vector is aligned to the stat order of its position, so the scoring loop
+    can index straight into NumPy arrays instead of probing the nested dictionaries
+    once per stat.
 
-def get_stat_contribution(stat, row, position, role, weights, stat_ranges_by_role):
-    """Function to calculate the contribution of a given stat to a player's rating.
-    
     Args:
-    stat (str): Name of the stat to calculate the contribution of.
-    row (pd.Series): Row containing the player's data.
-    position (str): Position of the player.
-    role (str): Role of the player.
+    position_stats (dict): Dictionary containing the stats for each position.
     weights (dict): Dictionary containing the weights for each stat for each position.
     stat_ranges_by_role (dict): Dictionary containing the ranges for each stat for each role.
 
     Returns:
-    float: Contribution of the stat to the player's rating.
+    dict: PositionKernel for each position.
     """
-    weight = weights.get(position, {}).get(stat, 0)
-    value = stat_value(row, stat)
-    max_value = stat_ranges_by_role[role].get(stat, 1)
-    normalised_value = value / max_value if max_value > 0 else 0
-    return weight * normalised_value
+    kernels = {}    # Dictionary to store the kernel for each position
+    shared = {} # Kernels keyed by the identity of their stats/weights, so aliased positions share one kernel
+    for position, stats in position_stats.items():  # Iterate over each position
+        key = (id(stats), id(weights[position]))    # Positions that alias the same stats and weights get the same key
+        if key in shared:   # Check if an identical kernel has already been built
+            kernels[position] = shared[key] # Reuse it instead of recomputing the vectors
+            continue
 
-# Calculation Functions
-def calculate_scores_and_ratings(df, position_stats, weights, stat_ranges_by_role):
+        weight_vec = np.array([weights[position].get(stat, 0) for stat in stats], dtype=np.float32) # Weight vector aligned to the stats
+        inv_max_by_role = {}    # Reciprocal maximum vector for each role
+        for role, ranges in stat_ranges_by_role.items():    # Iterate over each role
+            max_vec = np.array([ranges.get(stat, np.nan) for stat in stats], dtype=np.float64)  # Maximum value for each stat, NaN where the role has no range
+            usable = (max_vec > 0) & np.isfinite(max_vec)   # Stats with a usable positive range
+            inv_max = np.where(usable, 1.0 / np.where(usable, max_vec, 1.0), 0.0)   # Branchless reciprocal; unusable ranges contribute 0
+            inv_max_by_role[role] = inv_max.astype(np.float32)  # float32 halves memory traffic; stat values and weights fit its range comfortably
+        kernels[position] = shared[key] = PositionKernel(tuple(stats), weight_vec, inv_max_by_role,
+                                                         specialise_scorer(position, weight_vec))  # Add the kernel to the dictionary
+    return kernels
+
+def calculate_scores_and_ratings(df, kernels):
     """
     Function to calculate the raw scores and normalised ratings for each player in the dataset.
 
     Args:
     df (pd.DataFrame): DataFrame containing the player data.
-    position_stats (dict): Dictionary containing the stats for each position.
-    weights (dict): Dictionary containing the weights for each stat for each position.
-    stat_ranges_by_role (dict): Dictionary containing the ranges for each stat for each role.
+    kernels (dict): PositionKernel for each position, as built by build_kernels.
 
     Returns:
-    Tuple[List[float], List[float]]: Tuple containing the raw scores and normalised ratings for each
-    player in the dataset.
+    Tuple[np.ndarray, np.ndarray, float, float]: Tuple containing the raw scores and normalised
+    ratings for each player in the dataset, plus the minimum and maximum raw score used for
+    the normalisation.
     """
-    raw_scores = [] # List to store raw scores for each player
-    normalised_scores = []  # List to store normalised ratings for each player
-    for _, row in df.iterrows():    # Iterate over each row in DataFrame
-        position = row['Position']  # Get position of the player
-        role = row['Role']  # Get role of the player
-        if position not in position_stats or role not in stat_ranges_by_role:   # Check if position is in position_stats dictionary
-            raw_scores.append(None) # Append None to the raw_scores list if the position is not in the dictionary
-            normalised_scores.append(None)  # Append None to the normalised_scores list if the position is not in the dictionary
-            continue
+    raw_scores = np.full(len(df), np.nan)   # Array to store raw scores, NaN marks players that cannot be scored
+    roles = {role for kernel in kernels.values() for role in kernel.inv_max_by_role}    # Roles that have precomputed maximum vectors
+    valid = (df['Position'].isin(kernels) & df['Role'].isin(roles)).to_numpy()  # One C-level membership test per column
+    valid_rows = np.flatnonzero(valid)  # Positional row numbers of the players that can be scored
+    grouped = df.iloc[valid_rows].groupby(['Position', 'Role'], sort=False).indices # Row indices within the valid subset
+
+    all_stats = sorted({stat for kernel in kernels.values() for stat in kernel.stats})  # Every stat used by at least one position
+    col_idx = {stat: i for i, stat in enumerate(all_stats)} # Column index of each stat in the shared matrix
+    stats_matrix = df.reindex(columns=all_stats).to_numpy(dtype=np.float32, na_value=0.0)   # One NaN-free stats matrix for every player, built once
+    cols_by_position = {position: np.fromiter((col_idx[stat] for stat in kernel.stats), dtype=np.int64, count=len(kernel.stats))
+                        for position, kernel in kernels.items()}    # Column indices of each position's stats
+
+    for (position, role), sub_idx in grouped.items():   # Iterate over each (position, role) group
+        idx = valid_rows[sub_idx]   # Map the group back to row positions in the full DataFrame
+        kernel = kernels[position]  # Precomputed scoring inputs for the position
+        inv_max = kernel.inv_max_by_role[role]  # Reciprocal maximum for each stat in the role
+        X = stats_matrix[idx][:, cols_by_position[position]]    # Slice the group's rows and stats out of the shared matrix
+        if idx.size <= SMALL_GROUP_SIZE:    # Tiny groups skip kernel dispatch for the unrolled, constant-folded expression
+            raw_scores[idx] = kernel.score_small(X * inv_max)
+        elif NUMBA_AVAILABLE: # Use the fused JIT kernel when Numba is installed
+            score_block(X, inv_max, kernel.weight_vec, raw_scores, np.asarray(idx, dtype=np.int64))
+        else:
+            raw_scores[idx] = (X * inv_max) @ kernel.weight_vec # Normalise and weight all players in the group in one dot product
+
+    if np.isnan(raw_scores).all():  # Check if no player could be scored
+        min_raw, max_raw = 0, 1 # Fall back to a dummy range so the normalisation below is well-defined
+    else:
+        min_raw = np.nanmin(raw_scores) # Get minimum raw score
+        max_raw = np.nanmax(raw_scores) # Get maximum raw score
+    if max_raw != min_raw:  # Check if minimum and maximum raw scores are not equal
+        if NUMEXPR_AVAILABLE and raw_scores.size >= NUMEXPR_MIN_SIZE:   # Fuse the normalisation into one SIMD pass on large datasets
+            normalised_scores = ne.evaluate('1 + 9 * (raw_scores - min_raw) / (max_raw - min_raw)')
+        else:
+            normalised_scores = 1 + 9 * (raw_scores - min_raw) / (max_raw - min_raw)    # Calculate normalised rating for each player
+    else:
+        normalised_scores = np.where(np.isnan(raw_scores), np.nan, 1.0) # Set normalised rating to 1 if minimum and maximum raw scores are equal
+    return raw_scores, normalised_scores, min_raw, max_raw
 
-        stats = position_stats[position]    # Get stats for player's position
-        raw_score = sum(    # Calculate raw score for the player
-            get_stat_contribution(stat, row, position, role, weights, stat_ranges_by_role)  
-            for stat in stats
-        )
-        raw_scores.append(raw_score)    # Append raw score to the raw_scores list
-
-    min_raw = min(filter(None, raw_scores), default=0)  # Get minimum raw score
-    max_raw = max(filter(None, raw_scores), default=1)  # Get maximum raw score
-    normalised_scores = [   # Calculate normalised rating for each player
-        1 + 9 * (score - min_raw) / (max_raw - min_raw) if max_raw != min_raw else 1
-        for score in raw_scores
-    ]
-    return raw_scores, normalised_scores
-
-def debug_player_rating(player_name, df, position_stats, weights, stat_ranges_by_role):
+def debug_player_rating(player_name, df, position_stats, weights, stat_ranges_by_role, min_raw, max_raw):
     """
     Function to debug the rating calculation for a specific player and observe how each stat contributes to their rating.
 
@@ -109,6 +225,8 @@ def debug_player_rating(player_name, df, position_stats, weights, stat_ranges_by
     weights (dict): Dictionary containing the weights for each stat for each position.
     stat_ranges_by_role (dict): Dictionary containing the ranges for each stat for each
     role.
+    min_raw (float): Minimum raw score in the dataset, as returned by calculate_scores_and_ratings.
+    max_raw (float): Maximum raw score in the dataset, as returned by calculate_scores_and_ratings.
     """
     player_row = df[df['Name'] == player_name]  # Get the row for the player
     if player_row.empty:    # Check if player is not found
@@ -124,20 +242,23 @@ def debug_player_rating(player_name, df, position_stats, weights, stat_ranges_by
 
     print(f"Debugging for Player: {player_name}, Position: {position}, Role: {role}")
     print("-" * 50) # Print a line of dashes to separate the output
-    raw_score = 0   # Initialise the player's raw score
 
-    for stat in position_stats[position]:   # Iterate over each stat for the player's position
-        contribution = get_stat_contribution(stat, player_row, position, role, weights, stat_ranges_by_role)    # Calculate the contribution of the stat
-        raw_score += contribution   # Add the contribution of the stat to the player's raw score
+    stats = position_stats[position]    # Stats that contribute to the player's rating
+    weight_vec = np.fromiter((weights[position].get(stat, 0) for stat in stats), dtype=np.float64, count=len(stats))    # Weight vector aligned to the stats
+    max_vec = np.fromiter((stat_ranges_by_role[role].get(stat, 1) for stat in stats), dtype=np.float64, count=len(stats))   # Maximum value for each stat in the role
+    values = pd.to_numeric(player_row[stats], errors='coerce').to_numpy(dtype=np.float64)   # The player's stat values as one contiguous array
+    values = np.where(np.isnan(values), 0, values)  # Treat missing stats as 0
+    contributions = values / np.where(max_vec > 0, max_vec, np.inf) * weight_vec    # Contribution of each stat in one vectorized pass
+    raw_score = contributions.sum() # The player's raw score
+
+    for stat, contribution in zip(stats, contributions):    # Iterate only for printing
         print(f"Stat: {stat}, Contribution: {contribution:.2f}")
 
     print("-" * 50)
     print(f"Raw Score: {raw_score}")
 
-    min_raw_score_dataset = df['raw_score'].min()   # Get minimum raw score in the dataset
-    max_raw_score_dataset = df['raw_score'].max()   # Get maximum raw score in the dataset
-    if min_raw_score_dataset != max_raw_score_dataset:  # Check if minimum and maximum raw scores are not equal
-        normalised_score = 1 + (9 * (raw_score - min_raw_score_dataset) / (max_raw_score_dataset - min_raw_score_dataset))  # Calculate normalised rating
+    if min_raw != max_raw:  # Check if minimum and maximum raw scores are not equal
+        normalised_score = 1 + (9 * (raw_score - min_raw) / (max_raw - min_raw))    # Calculate normalised rating with the precomputed score range
     else:
         normalised_score = 1    # Set normalised rating to 1 if minimum and maximum raw scores are equal
 
@@ -157,7 +278,9 @@ def main():
         'CB': 'Defenders', 'LB': 'Defenders', 'RB': 'Defenders',
         'GK': 'Goalkeepers'
     }
-    df['Role'] = df['Position'].map(position_roles)
+    codes = pd.Index(list(position_roles)).get_indexer(df['Position'])  # Integer code per position, -1 for unknown positions
+    roles_arr = np.array(list(position_roles.values()), dtype=object)   # Role for each position code, aligned to the categories
+    df['Role'] = np.where(codes >= 0, roles_arr[codes.clip(min=0)], None)   # One gather on the codes instead of a dict lookup per row
 
     # Position-specific stats that will contribute to how they are rated
     position_stats = {
@@ -174,13 +297,6 @@ def main():
                 'dispossessed', 'possessionLost', 'possessionWonAttThird', 'touches', 'wasFouled', 'fouls',
                 'ownGoals', 'dribbledPast', 'offsides', 'passToAssist', 'duelLost', 'tacklesWon', 
                 'totwAppearances', 'expectedGoals', 'ballRecovery', 'appearances'],
-    'RW': ['rating', 'goals', 'bigChancesCreated', 'bigChancesMissed', 'assists', 'expectedAssists',
-                'accuratePasses', 'inaccuratePasses', 'keyPasses', 'successfulDribbles', 'tackles',
-                'interceptions', 'yellowCards', 'redCards', 'accurateCrosses', 'totalShots', 'shotsOnTarget',
-                'totalDuelsWon', 'penaltyWon', 'penaltyConceded', 'accurateLongBalls', 'errorLeadToGoal',
-                'dispossessed', 'possessionLost', 'possessionWonAttThird', 'touches', 'wasFouled', 'fouls',
-                'ownGoals', 'dribbledPast', 'offsides', 'passToAssist', 'duelLost', 'tacklesWon', 
-                'totwAppearances', 'expectedGoals', 'ballRecovery', 'appearances'],
         'AM': ['rating', 'goals', 'bigChancesCreated', 'bigChancesMissed', 'assists', 'expectedAssists',
             'accuratePasses', 'inaccuratePasses', 'accurateOppositionHalfPasses', 'accurateFinalThirdPasses',
             'keyPasses', 'successfulDribbles', 'tackles', 'interceptions', 'yellowCards', 'redCards',
@@ -204,15 +320,6 @@ def main():
             'possessionLost', 'possessionWonAttThird', 'touches', 'wasFouled', 'fouls', 'ownGoals',
             'dribbledPast', 'offsides', 'blockedShots', 'passToAssist', 'cleanSheet', 'duelLost', 
             'goalsConceded', 'tacklesWon', 'totwAppearances', 'expectedGoals', 'ballRecovery', 'appearances'],
-        'RB': ['rating', 'goals', 'bigChancesCreated', 'bigChancesMissed', 'assists', 'expectedAssists',
-                'accuratePasses', 'inaccuratePasses', 'accurateOwnHalfPasses', 'accurateOppositionHalfPasses',
-                'accurateFinalThirdPasses', 'keyPasses', 'successfulDribbles', 'tackles', 'interceptions',
-                'yellowCards', 'redCards', 'accurateCrosses', 'totalShots', 'shotsOnTarget', 'groundDuelsWon',
-                'aerialDuelsWon', 'penaltyWon', 'penaltyConceded', 'accurateLongBalls', 'clearances',
-                'errorLeadToGoal', 'errorLeadToShot', 'dispossessed', 'possessionLost', 'possessionWonAttThird',
-                'touches', 'wasFouled', 'fouls', 'ownGoals', 'dribbledPast', 'offsides', 'blockedShots',
-                'passToAssist', 'cleanSheet', 'duelLost', 'aerialLost', 'goalsConceded', 'tacklesWon',
-                'totwAppearances', 'expectedGoals', 'ballRecovery', 'appearances'],
         'LB': ['rating', 'goals', 'bigChancesCreated', 'bigChancesMissed', 'assists', 'expectedAssists',
                 'accuratePasses', 'inaccuratePasses', 'accurateOwnHalfPasses', 'accurateOppositionHalfPasses',
                 'accurateFinalThirdPasses', 'keyPasses', 'successfulDribbles', 'tackles', 'interceptions',
@@ -237,6 +344,8 @@ def main():
             'punches', 'successfulRunsOut', 'highClaims', 'crossesNotClaimed', 'duelLost', 'aerialLost',
             'goalsConceded', 'totwAppearances', 'ballRecovery', 'appearances']
     }
+    position_stats['RW'] = position_stats['LW'] # RW rates on the same stats as LW; alias instead of duplicating the list
+    position_stats['RB'] = position_stats['LB'] # RB rates on the same stats as LB
 
     # Weighted stats for each position based on their importance (IMO)
     weights = {
@@ -263,18 +372,6 @@ def main():
             'duelLost': -0.3, 'tacklesWon': 0.7, 'totwAppearances': 1.2, 'expectedGoals': 2.8,
             'ballRecovery': 0.5, 'appearances': 0.3
         },
-        'RW':   {
-            'rating': 1.0, 'goals': 2.5, 'bigChancesCreated': 2.0, 'bigChancesMissed': -1.2,
-            'assists': 2.0, 'expectedAssists': 1.5, 'accuratePasses': 0.7, 'inaccuratePasses': -0.3,
-            'keyPasses': 1.8, 'successfulDribbles': 1.5, 'tackles': 0.6, 'interceptions': 0.6,
-            'yellowCards': -1.0, 'redCards': -2.0, 'accurateCrosses': 1.5, 'totalShots': 1.5,
-            'shotsOnTarget': 1.8, 'totalDuelsWon': 0.9, 'penaltyWon': 1.0, 'penaltyConceded': -1.5,
-            'accurateLongBalls': 0.5, 'errorLeadToGoal': -2.0, 'dispossessed': -0.8, 'possessionLost': -0.5,
-            'possessionWonAttThird': 1.2, 'touches': 0.4, 'wasFouled': 0.6, 'fouls': -0.3,
-            'ownGoals': -3.0, 'dribbledPast': -1.0, 'offsides': -0.5, 'passToAssist': 1.5,
-            'duelLost': -0.3, 'tacklesWon': 0.7, 'totwAppearances': 1.2, 'expectedGoals': 2.8,
-            'ballRecovery': 0.5, 'appearances': 0.3
-        },
         'AM':   {
             'rating': 1.0, 'goals': 2.0, 'bigChancesCreated': 2.5, 'bigChancesMissed': -1.0,
             'assists': 2.5, 'expectedAssists': 2.0, 'accuratePasses': 1.0, 'inaccuratePasses': -0.4,
@@ -315,20 +412,6 @@ def main():
             'tacklesWon': 2.0, 'totwAppearances': 1.5, 'expectedGoals': 1.2, 'ballRecovery': 2.0,
             'appearances': 0.3
         },
-        'RB':   {
-            'rating': 1.0, 'goals': 0.8, 'bigChancesCreated': 1.5, 'bigChancesMissed': -0.5,
-            'assists': 1.8, 'expectedAssists': 1.5, 'accuratePasses': 1.2, 'inaccuratePasses': -0.3,
-            'accurateOwnHalfPasses': 1.5, 'accurateOppositionHalfPasses': 1.2, 'accurateFinalThirdPasses': 1.5,
-            'keyPasses': 1.8, 'successfulDribbles': 1.0, 'tackles': 2.0, 'interceptions': 1.8,
-            'yellowCards': -1.0, 'redCards': -2.0, 'accurateCrosses': 1.5, 'totalShots': 0.8,
-            'shotsOnTarget': 0.8, 'groundDuelsWon': 1.5, 'aerialDuelsWon': 1.0, 'penaltyWon': 0.5,
-            'penaltyConceded': -1.5, 'accurateLongBalls': 1.0, 'clearances': 1.5, 'errorLeadToGoal': -2.5,
-            'errorLeadToShot': -1.8, 'dispossessed': -0.5, 'possessionLost': -0.3, 'possessionWonAttThird': 1.2,
-            'touches': 0.6, 'wasFouled': 0.6, 'fouls': -0.5, 'ownGoals': -3.0, 'dribbledPast': -1.5,
-            'offsides': -0.2, 'blockedShots': 1.0, 'passToAssist': 1.2, 'cleanSheet': 1.5,
-            'duelLost': -0.5, 'aerialLost': -0.3, 'goalsConceded': -1.5, 'tacklesWon': 2.0,
-            'totwAppearances': 1.5, 'expectedGoals': 0.8, 'ballRecovery': 1.8, 'appearances': 0.3
-        },
         'LB':   {
             'rating': 1.0, 'goals': 0.8, 'bigChancesCreated': 1.5, 'bigChancesMissed': -0.5,
             'assists': 1.8, 'expectedAssists': 1.5, 'accuratePasses': 1.2, 'inaccuratePasses': -0.3,
@@ -368,20 +451,22 @@ def main():
             'appearances': 0.3
         }
     }
+    weights['RW'] = weights['LW']   # RW shares LW's weights; alias instead of duplicating the dict
+    weights['RB'] = weights['LB']   # RB shares LB's weights
 
-    stat_ranges_by_role = {}    # Dictionary to store the maximum values for each stat for each role
-    for role, group in df.groupby('Role'):  # Iterate over each role in the dataset and group by role
-        max_values = {stat: group[stat].max(skipna=True) for position in position_stats for stat in position_stats[position]}   # Get the maximum value for each stat in the group
-        stat_ranges_by_role[role] = max_values  # Add the maximum values to the dictionary
+    all_stats = sorted({stat for stats in position_stats.values() for stat in stats})   # Every stat used by at least one position
+    df[all_stats] = df[all_stats].apply(pd.to_numeric, errors='coerce').astype('float64')   # Guarantee contiguous numeric blocks for the scorer
+    role_maxes = df.groupby('Role', sort=False)[all_stats].max()    # Maximum value of each stat within each role, one pass per column
+    stat_ranges_by_role = {role: role_maxes.loc[role].to_dict() for role in role_maxes.index}   # Dictionary of maximum values for each stat for each role
 
-    df['raw_score'], df['normalised_rating'] = calculate_scores_and_ratings(df, position_stats, weights, stat_ranges_by_role)   # Calculate raw scores and normalised ratings
+    kernels = build_kernels(position_stats, weights, stat_ranges_by_role)   # Pre-build the scoring kernel for each position
+    df['raw_score'], df['normalised_rating'], min_raw, max_raw = calculate_scores_and_ratings(df, kernels)  # Calculate raw scores and normalised ratings
 
-    calculated_df = df[['Name', 'Position', 'raw_score', 'normalised_rating']]
-    save_table_to_db(calculated_df, "calculations", conn)   # Save the calculated ratings to the database
+    save_calculations(df, conn) # Stream the calculated ratings to the database
 
     print("Raw scores and normalised ratings have been successfully saved to the 'calculations' table.")
 
-    debug_player_rating("Will Vaulks", df, position_stats, weights, stat_ranges_by_role)    # Debug the rating for a specific player (e.g. Will Vaulks)
+    debug_player_rating("Will Vaulks", df, position_stats, weights, stat_ranges_by_role, min_raw, max_raw)  # Debug the rating for a specific player (e.g. Will Vaulks)
 
     conn.close()    # Close database connection
 